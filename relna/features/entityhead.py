@@ -24,12 +24,13 @@ class EntityHeadTokenFeatureGenerator(EdgeFeatureGenerator):
 
 
     def generate(self, dataset, feature_set, is_training_mode):
+        entity_counts = {}
         for edge in dataset.edges():
             entity1 = edge.entity1
             entity2 = edge.entity2
 
-            self.named_entity_count('entity1_', entity1.class_id, edge, feature_set, is_training_mode)
-            self.named_entity_count('entity2_', entity2.class_id, edge, feature_set, is_training_mode)
+            self.named_entity_count('entity1_', entity1.class_id, edge, feature_set, is_training_mode, entity_counts)
+            self.named_entity_count('entity2_', entity2.class_id, edge, feature_set, is_training_mode, entity_counts)
 
             entity1_stem = self.stemmer.stem(entity1.head_token.word)
             entity1_non_stem = entity1.head_token.word[len(entity1_stem):]
@@ -55,9 +56,20 @@ class EntityHeadTokenFeatureGenerator(EdgeFeatureGenerator):
             self.add_to_feature_set(feature_set, is_training_mode, edge, feature_name_2_4)
 
 
-    def named_entity_count(self, prefix, entity_type, edge, feature_set, is_training_mode):
-        entities = edge.same_part.get_entities_in_sentence(edge.same_sentence_id, entity_type)
-        feature_name = '1_'+prefix+entity_type+'_count_['+str(len(entities))+']'
+    def named_entity_count(self, prefix, entity_type, edge, feature_set, is_training_mode, entity_counts=None):
+        """
+        :param entity_counts: optional cache of (part id, sentence id, entity type) -> number of entities,
+            shared by the edges of a dataset during one generate call
+        :type entity_counts: dict
+        """
+        if entity_counts is None:
+            entity_counts = {}
+        sentence_key = (id(edge.same_part), edge.same_sentence_id, entity_type)
+        count = entity_counts.get(sentence_key)
+        if count is None:
+            count = len(edge.same_part.get_entities_in_sentence(edge.same_sentence_id, entity_type))
+            entity_counts[sentence_key] = count
+        feature_name = '1_'+prefix+entity_type+'_count_['+str(count)+']'
         self.add_to_feature_set(feature_set, is_training_mode, edge, feature_name)
 
 
@@ -103,9 +103,9 @@ class LocationWordFeatureGenerator(EdgeFeatureGenerator):
                 head2 = edge.entity1.head_token
             sentence = edge.same_part.sentences[edge.same_sentence_id]
             for token in sentence:
-                if not token.is_entity_part(edge.same_part) and \
-                    ('location' in token.word.lower() or \
-                    'localize' in token.word.lower()):
+                word = token.word.lower()
+                if ('location' in word or 'localize' in word) and \
+                    not token.is_entity_part(edge.same_part):
                     location_word = True
                     if head1.features['id']<token.features['id']<head2.features['id']:
                         feature_name = '88_localize_word_in_between_[0]'
@@ -2,6 +2,49 @@ from nalaf.features.relations import EdgeFeatureGenerator
 from nltk.stem import PorterStemmer
 from math import log2
 from operator import itemgetter
+from collections import Counter, OrderedDict
+
+
+class BulkEdgeFeatureGenerator(EdgeFeatureGenerator):
+    """
+    Edge feature generator that can add many features to an edge at once
+    """
+
+    def add_many_to_feature_set(self, feature_set, is_training_mode, edge, features):
+        """
+        Same as calling add_to_feature_set for every feature, except that the
+        features already present in the feature set are written to the edge
+        with a single update.
+
+        :param features: the features to add to the edge
+        :type features: iterable of (feature_name, value)
+        """
+        known_features = {}
+        for feature_name, value in features:
+            feature_id = feature_set.get(feature_name)
+            if feature_id is not None:
+                known_features[feature_id] = value
+            elif is_training_mode:
+                self.add_to_feature_set(feature_set, is_training_mode, edge, feature_name, value)
+        edge.features.update(known_features)
+
+
+    @staticmethod
+    def edges_by_sentence(dataset):
+        """
+        Groups the edges of the dataset by the sentence they belong to, keeping
+        the order in which the sentences are first seen.
+
+        :type dataset: nalaf.structures.data.Dataset
+        :return: iterator of (part, sentence_id, list of edges)
+        """
+        groups = OrderedDict()
+        for edge in dataset.edges():
+            key = (id(edge.same_part), edge.same_sentence_id)
+            if key not in groups:
+                groups[key] = (edge.same_part, edge.same_sentence_id, [])
+            groups[key][2].append(edge)
+        return iter(groups.values())
 
 
 class TokenFeatureGenerator(EdgeFeatureGenerator):
@@ -29,37 +72,37 @@ class TokenFeatureGenerator(EdgeFeatureGenerator):
 
 
     def annotated_types(self, token, edge):
-        head1 = edge.entity1.head_token
-        head2 = edge.entity2.head_token
-        if not token.is_entity_part(edge.same_part):
-            feature_name = 'no_ann_type'
-            return [feature_name]
-        else:
-            ann_types = []
-            if token.is_entity_part(edge.same_part):
-                entity = token.get_entity(edge.same_part)
-                feature_name_1 = entity.class_id
-                ann_types.append(feature_name_1)
-                if entity==edge.entity1:
-                    feature_name_2 = 'entity1_'+edge.entity1.class_id
-                    ann_types.append(feature_name_2)
-                    return ann_types
-                elif entity==edge.entity2:
-                    feature_name_2 = 'entity2_'+edge.entity2.class_id
-                    ann_types.append(feature_name_2)
-                    return ann_types
-                return ann_types
+        part = edge.same_part
+        if not token.is_entity_part(part):
+            return ['no_ann_type']
+
+        entity = token.get_entity(part)
+        ann_types = [entity.class_id]
+        if entity==edge.entity1:
+            ann_types.append('entity1_'+edge.entity1.class_id)
+        elif entity==edge.entity2:
+            ann_types.append('entity2_'+edge.entity2.class_id)
+        return ann_types
 
 
 def calculateInformationGain(feature_set, dataset, output_file):
     number_pos_instances = 0
     number_neg_instances = 0
+    number_neg_target_instances = 0
+    # number of edges of each class in which each feature (id) is present,
+    # counted in a single pass over the edges
+    present_in_pos = Counter()
+    present_in_neg = Counter()
 
     for edge in dataset.edges():
         if edge.real_target == 1:
             number_pos_instances += 1
+            present_in_pos.update(edge.features.keys())
         else:
             number_neg_instances += 1
+            if edge.real_target == -1:
+                number_neg_target_instances += 1
+                present_in_neg.update(edge.features.keys())
 
     number_total_instances = number_pos_instances + number_neg_instances
     percentage_pos_instances = number_pos_instances / number_total_instances
@@ -68,28 +111,12 @@ def calculateInformationGain(feature_set, dataset, output_file):
     first_ent_component = -1 * (percentage_pos_instances * log2(percentage_pos_instances) + percentage_neg_instances * log2(percentage_neg_instances))
     feature_list = []
     for key, value in feature_set.items():
-        feature_present_in_pos = 0
-        feature_present_in_neg = 0
-        feature_absent_in_pos = 0
-        feature_absent_in_neg = 0
-        total_feature_present = 0
-        total_feature_absent = 0
-
-        for edge in dataset.edges():
-            if edge.real_target == 1:
-                if value in edge.features.keys():
-                    feature_present_in_pos += 1
-                    total_feature_present += 1
-                else:
-                    feature_absent_in_pos += 1
-                    total_feature_absent +=1
-            if edge.real_target == -1:
-                if value in edge.features.keys():
-                    feature_present_in_neg += 1
-                    total_feature_present += 1
-                else:
-                    feature_absent_in_neg += 1
-                    total_feature_absent += 1
+        feature_present_in_pos = present_in_pos[value]
+        feature_present_in_neg = present_in_neg[value]
+        feature_absent_in_pos = number_pos_instances - feature_present_in_pos
+        feature_absent_in_neg = number_neg_target_instances - feature_present_in_neg
+        total_feature_present = feature_present_in_pos + feature_present_in_neg
+        total_feature_absent = feature_absent_in_pos + feature_absent_in_neg
 
         percentage_pos_given_feature = 0
         percentage_neg_given_feature = 0
@@ -1,10 +1,11 @@
-from nalaf.features.relations import EdgeFeatureGenerator
-from relna.features.relations import TokenFeatureGenerator
+from relna.features.relations import BulkEdgeFeatureGenerator, TokenFeatureGenerator
 from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
+from collections import Counter, OrderedDict
+from itertools import chain
+from relna.utils.stemmer_utils import CachedPorterStemmer
 
 
-class BagOfWordsFeatureGenerator(EdgeFeatureGenerator):
+class BagOfWordsFeatureGenerator(BulkEdgeFeatureGenerator):
     """
     Generates Bag of Words representation for each sentence that contains an edge
 
@@ -15,29 +16,28 @@ class BagOfWordsFeatureGenerator(EdgeFeatureGenerator):
     def __init__(self, stop_words=None):
         if stop_words is None:
             stop_words = stopwords.words('english')
-        self.stop_words = stop_words
-        """a list of stop words"""
+        self.stop_words = frozenset(stop_words)
+        """a set of stop words"""
 
 
     def generate(self, dataset, feature_set, is_training_mode):
-        for edge in dataset.edges():
-            sentence = edge.same_part.sentences[edge.same_sentence_id]
-            bow_map = {}
-            for token in sentence:
-                if token.word not in self.stop_words and not token.features['is_punct']:
-                    feature_name = '2_bow_text_' + token.word + '_[0]'
-                    self.add_to_feature_set(feature_set, is_training_mode, edge, feature_name)
-                    if token.is_entity_part(edge.same_part):
-                        bow_string = 'ne_bow_' + token.word + '_[0]'
-                        if bow_string not in bow_map.keys():
-                            bow_map[bow_string] = 0
-                        bow_map[bow_string] = bow_map[bow_string]+1
-            for key, value in bow_map.items():
-                feature_name = '3_'+key
-                self.add_to_feature_set(feature_set, is_training_mode, edge, feature_name, value)
-
-
-class StemmedBagOfWordsFeatureGenerator(EdgeFeatureGenerator):
+        stop_words = self.stop_words
+        add_many = self.add_many_to_feature_set
+        for part, sentence_id, edges in self.edges_by_sentence(dataset):
+            sentence = part.sentences[sentence_id]
+            tokens = [token for token in sentence
+                      if token.word not in stop_words and not token.features['is_punct']]
+            words = OrderedDict.fromkeys(token.word for token in tokens)
+            entity_words = Counter(token.word for token in tokens if token.is_entity_part(part))
+            features = list(chain(
+                (('2_bow_text_' + word + '_[0]', 1) for word in words),
+                (('3_ne_bow_' + word + '_[0]', value) for word, value in entity_words.items())))
+
+            for edge in edges:
+                add_many(feature_set, is_training_mode, edge, features)
+
+
+class StemmedBagOfWordsFeatureGenerator(BulkEdgeFeatureGenerator):
     """
     Generates stemmed Bag of Words representation for each sentence that contains
     an edge, using the function given in the argument.
@@ -45,30 +45,38 @@ class StemmedBagOfWordsFeatureGenerator(EdgeFeatureGenerator):
     By default it uses Porter stemmer
 
     :type feature_set: nalaf.structures.data.FeatureDictionary
-    :type stemmer: nltk.stem.PorterStemmer
+    :type stemmer: relna.utils.stemmer_utils.CachedPorterStemmer
     :type stop_words: list[str]
+    :type stemmer_backend: str
     :type is_training_mode: bool
     """
 
-    def __init__(self, stop_words=[]):
-        self.stemmer = PorterStemmer()
-        """an instance of the PorterStemmer"""
-        self.stop_words = stop_words
-        """a list of stop words"""
+    def __init__(self, stop_words=None, stemmer_backend='nltk'):
+        self.stemmer = CachedPorterStemmer(stemmer_backend)
+        """an instance of the CachedPorterStemmer"""
+        if stop_words is None:
+            stop_words = []
+        self.stop_words = frozenset(self.stemmer.stem_words(list(stop_words)))
+        """a set of stemmed stop words, since they are compared against stemmed tokens"""
 
 
     def generate(self, dataset, feature_set, is_training_mode):
-        for edge in dataset.edges():
-            sentence = edge.same_part.sentences[edge.same_sentence_id]
+        if not is_training_mode:
+            return
+
+        stem = self.stemmer.stem
+        stop_words = self.stop_words
+        add_many = self.add_many_to_feature_set
+        for part, sentence_id, edges in self.edges_by_sentence(dataset):
+            sentence = part.sentences[sentence_id]
+            stems = (stem(token.word) for token in sentence if not token.features['is_punct'])
+            features = [('4_bow_stem_' + stemmed + '_[0]', 1) for stemmed in stems if stemmed not in stop_words]
 
-            if is_training_mode:
-                for token in sentence:
-                    if self.stemmer.stem(token.word) not in self.stop_words and not token.features['is_punct']:
-                        feature_name = '4_bow_stem_' + self.stemmer.stem(token.word) + '_[0]'
-                        self.add_to_feature_set(feature_set, is_training_mode, edge, feature_name)
+            for edge in edges:
+                add_many(feature_set, is_training_mode, edge, features)
 
 
-class SentenceFeatureGenerator(EdgeFeatureGenerator):
+class SentenceFeatureGenerator(BulkEdgeFeatureGenerator):
     """
     Generate features for each sentence containing an edge
     """
@@ -79,24 +87,29 @@ class SentenceFeatureGenerator(EdgeFeatureGenerator):
 
 
     def generate(self, dataset, feature_set, is_training_mode):
-        for edge in dataset.edges():
-            sentence = edge.same_part.sentences[edge.same_sentence_id]
-            text_count = {}
-            for token in sentence:
-                ann_types = self.token_feature_generator.annotated_types(token, edge)
-                for ann in ann_types:
-                    if ann not in text_count.keys():
-                        text_count[ann] = 0
-                    text_count[ann] = text_count[ann]+1
-            for key, value in text_count.items():
-                feature_name = '5_'+key+'_[0]'
-                self.add_to_feature_set(feature_set, is_training_mode, edge, feature_name, value=value)
-
-
-class WordFilterFeatureGenerator(EdgeFeatureGenerator):
+        annotated_types = self.token_feature_generator.annotated_types
+        add_many = self.add_many_to_feature_set
+        for part, sentence_id, edges in self.edges_by_sentence(dataset):
+            sentence = part.sentences[sentence_id]
+            # only the annotated types of entity tokens depend on the edge
+            entity_tokens = [token for token in sentence if token.is_entity_part(part)]
+            no_ann_type_count = len(sentence) - len(entity_tokens)
+
+            for edge in edges:
+                text_count = Counter()
+                if no_ann_type_count > 0:
+                    text_count['no_ann_type'] = no_ann_type_count
+                for token in entity_tokens:
+                    text_count.update(annotated_types(token, edge))
+                add_many(feature_set, is_training_mode, edge,
+                         (('5_'+key+'_[0]', value) for key, value in text_count.items()))
+
+
+class WordFilterFeatureGenerator(BulkEdgeFeatureGenerator):
     """
     Checks if the sentence containing an edge contains any of the words
-    given in the list.
+    given in the list. An entry of several words separated by spaces is
+    matched against consecutive tokens of the sentence.
 
     Value of 1 means that the sentence contains that word
     Value of 0 means that the sentence does not contain the word
@@ -104,30 +117,49 @@ class WordFilterFeatureGenerator(EdgeFeatureGenerator):
     :type feature_set: nalaf.structures.data.FeatureDictionary
     :type words: list[str]
     :type stem: bool
+    :type stemmer_backend: str
     :type is_training_mode: bool
     """
-    def __init__(self, words, stem=True):
+    def __init__(self, words, stem=True, stemmer_backend='nltk'):
         self.words = words
         """a list of words to check for their presence in the sentence"""
         self.stem = stem
         """whether the words in the sentence and the list should be stemmed"""
-        self.stemmer = PorterStemmer()
+        self.stemmer = CachedPorterStemmer(stemmer_backend)
+        """an instance of the CachedPorterStemmer"""
+        self._patterns = {}
+        """first (stemmed) word -> list of (stemmed) word tuples to check for"""
+        for entry in self.words:
+            pattern = entry.split()
+            if self.stem:
+                pattern = self.stemmer.stem_words(pattern)
+            if pattern:
+                patterns = self._patterns.setdefault(pattern[0], [])
+                if tuple(pattern) not in patterns:
+                    patterns.append(tuple(pattern))
 
 
     def generate(self, dataset, feature_set, is_training_mode):
+        add_many = self.add_many_to_feature_set
+        patterns = self._patterns
         if self.stem:
-            stemmed_words = [self.stemmer.stem(word) for word in self.words]
-            for edge in dataset.edges():
-                sentence = edge.same_part.sentences[edge.same_sentence_id]
-                for token in sentence:
-                    if self.stemmer.stem(token.word) in stemmed_words:
-                        feature_name = '6_word_filter_stem_' + self.stemmer.stem(token.word) + '_[0]'
-                        self.add_to_feature_set(feature_set, is_training_mode, edge, feature_name)
-
+            stem = self.stemmer.stem
+            prefix = '6_word_filter_stem_'
         else:
-            for edge in dataset.edges():
-                sentence = edge.same_part.sentences[edge.same_sentence_id]
-                for token in sentence:
-                    if token.word in self.words:
-                        feature_name = '6_word_filter_' + token.word + '_[0]'
-                        self.add_to_feature_set(feature_set, is_training_mode, edge, feature_name)
+            prefix = '6_word_filter_'
+
+        for part, sentence_id, edges in self.edges_by_sentence(dataset):
+            sentence = part.sentences[sentence_id]
+            if self.stem:
+                texts = [stem(token.word) for token in sentence]
+            else:
+                texts = [token.word for token in sentence]
+
+            features = []
+            for index, text in enumerate(texts):
+                for pattern in patterns.get(text, ()):
+                    if len(pattern) == 1 or tuple(texts[index:index+len(pattern)]) == pattern:
+                        features.append((prefix + ' '.join(pattern) + '_[0]', 1))
+
+            for edge in edges:
+                add_many(feature_set, is_training_mode, edge, features)
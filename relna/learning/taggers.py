@@ -12,6 +12,9 @@ from relna.features.path import *
 from relna.features.sentence import *
 from nalaf.features.relations.sentence import NamedEntityCountFeatureGenerator
 from relna.features.ngrams import *
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 
 
 class RelnaRelationExtractor(RelationExtractor):
@@ -64,10 +67,18 @@ class TranscriptionFactorTagger(Tagger):
     Performs tagging for transcription factors in text, using GNormPlus and
     GO Term GO:0003700 or its descendents as the key. Any protein that has this
     GO Term will be automatically tagged as a transcription factor.
+
+    :param max_workers: the number of concurrent requests made to GNormPlus.
+        GNormPlus is a public NCBI service that is rate limited, too many
+        concurrent requests can get the client's IP blocked; and GNormPlus is
+        not known to be thread-safe. Hence requests are sequential by default.
+    :type max_workers: int
     """
-    def __init__(self, goterms):
+    def __init__(self, goterms, max_workers=1):
         super().__init__([ENTREZ_GENE_ID, UNIPROT_ID])
         self.transfac_go_terms = self.read_go_terms(goterms)
+        self.max_workers = max_workers
+        """the number of concurrent requests made to GNormPlus"""
 
     def tag(self, dataset, annotated=False, uniprot=False):
         """
@@ -75,48 +86,58 @@ class TranscriptionFactorTagger(Tagger):
         :param annotated: if True then saved into annotations otherwise into predicted_annotations
         """
         with GNormPlus() as gnorm:
-            for docid, doc in dataset.documents.items():
-
-                # So far this was enough for finding out if full document or not; not entirely reliable
-                is_fulltext = 'Conclusion' in doc.get_text()
-
-                if is_fulltext:
-                    genes = gnorm.get_genes_for_text(doc, docid, postproc=True)
-                else:
-                    genes, _, _ = gnorm.get_genes_for_pmid(docid, postproc=True)
+            docids = list(dataset.documents.keys())
+            if self.max_workers > 1:
+                # the requests are network bound, so the documents can be queried concurrently
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    genes_per_document = dict(zip(docids, executor.map(
+                        lambda docid: self.get_genes(gnorm, docid, dataset.documents[docid]), docids)))
+            else:
+                genes_per_document = {docid: self.get_genes(gnorm, docid, dataset.documents[docid])
+                                      for docid in docids}
+
+            # the uniprot ids and go terms are retrieved once for all the genes of the dataset
+            all_genes = list(chain.from_iterable(genes_per_document.values()))
+
+            # if uniprot normalisation as well then:
+            genes_mapping = {}
+            if uniprot:
+                with Swissprot() as uprot:
+                    list_of_ids = gnorm.uniquify_genes(all_genes)
+                    genes_mapping = uprot.get_uniprotid_for_entrez_geneid(list_of_ids)
+
+            goterms_mapping = {}
+            with GOTerms() as go:
+                list_of_ids = self.uniquify_proteins(genes_mapping.values())
+                goterms_mapping = go.get_goterms_for_uniprot_id(list_of_ids)
 
-                # genes
-                # if uniprot normalisation as well then:
-                genes_mapping = {}
-                if uniprot:
-                    with Swissprot() as uprot:
-                        list_of_ids = gnorm.uniquify_genes(genes)
-                        genes_mapping = uprot.get_uniprotid_for_entrez_geneid(list_of_ids)
-
-                goterms_mapping = {}
-                with GOTerms() as go:
-                    list_of_ids = self.uniquify_proteins(genes_mapping.values())
-                    goterms_mapping = go.get_goterms_for_uniprot_id(list_of_ids)
+            for docid, doc in dataset.documents.items():
+                genes = genes_per_document[docid]
 
-                last_index = -1
+                # bucket the genes by the part their offset falls in
+                parts = []
+                part_starts = []
                 part_index = 0
-                for partid, part in doc.parts.items():
-                    last_index = part_index
+                for part in doc.parts.values():
+                    parts.append(part)
+                    part_starts.append(part_index)
                     part_index += part.get_size() + 1
-                    for gene in genes:
-                        if gene[2] in part.text and last_index <= gene[0] < part_index:
+
+                genes_in_part = [[] for _ in parts]
+                for gene in genes:
+                    if 0 <= gene[0] < part_index:
+                        genes_in_part[bisect_right(part_starts, gene[0]) - 1].append(gene)
+
+                for part, last_index, part_genes in zip(parts, part_starts, genes_in_part):
+                    for gene in part_genes:
+                        if gene[2] in part.text:
                             start = gene[0] - last_index
                             # confidence value is arbitrary for gnormplus because there is no value supplied
                             ann = Entity(class_id=PRO_CLASS_ID, offset=start, text=gene[2], confidence=0.5)
-                            try:
-                                uniprotids = genes_mapping[gene[3]]
-                                for uniprotid in uniprotids:
-                                    go_terms = goterms_mapping[uniprotid]
-                                    for go_term in go_terms:
-                                        if go_term in self.transfac_go_terms:
-                                            ann.class_id=MUT_CLASS_ID
-                            except KeyError:
-                                pass
+                            if any(go_term in self.transfac_go_terms
+                                   for uniprotid in genes_mapping.get(gene[3], ())
+                                   for go_term in goterms_mapping.get(uniprotid, ())):
+                                ann.class_id = MUT_CLASS_ID
                             try:
                                 norm_dict = {
                                     ENTREZ_GENE_ID: gene[3],
@@ -133,9 +154,23 @@ class TranscriptionFactorTagger(Tagger):
                             else:
                                 part.predicted_annotations.append(ann)
 
+    def get_genes(self, gnorm, docid, doc):
+        """
+        :type gnorm: nalaf.utils.ncbi_utils.GNormPlus
+        :return: the genes found by GNormPlus in the document
+        """
+        # So far this was enough for finding out if full document or not; not entirely reliable
+        is_fulltext = 'Conclusion' in doc.get_text()
+
+        if is_fulltext:
+            return gnorm.get_genes_for_text(doc, docid, postproc=True)
+        else:
+            genes, _, _ = gnorm.get_genes_for_pmid(docid, postproc=True)
+            return genes
+
     def read_go_terms(self, file):
         with open(file) as goose:
-            return goose.read().splitlines()
+            return frozenset(goose.read().splitlines())
 
     def uniquify_proteins(self, proteins_object):
         """
@@ -0,0 +1,52 @@
+from functools import lru_cache
+from nltk.stem import PorterStemmer
+
+try:
+    import Stemmer
+except ImportError:
+    Stemmer = None
+
+
+class CachedPorterStemmer:
+    """
+    Porter stemmer that memoizes its results.
+
+    The feature generators stem every token of every sentence containing an
+    edge, so the same words are stemmed over and over again.
+
+    By default the nltk PorterStemmer is used, like everywhere else in relna.
+    With backend='pystemmer' the C implementation of PyStemmer
+    (`pip install relna[fast]`) is used instead. Both do not yield the same
+    stems for every word (e.g. nltk lowercases), so a model must be trained
+    and used with the same backend.
+
+    :param backend: either 'nltk' or 'pystemmer'
+    :type backend: str
+    """
+    def __init__(self, backend='nltk'):
+        if backend == 'nltk':
+            self.stemmer = PorterStemmer()
+            self._stem = self.stemmer.stem
+        elif backend == 'pystemmer':
+            if Stemmer is None:
+                raise ImportError("the 'pystemmer' backend requires PyStemmer: pip install relna[fast]")
+            self.stemmer = Stemmer.Stemmer('porter')
+            self._stem = self.stemmer.stemWord
+        else:
+            raise ValueError("unknown stemmer backend '{}', expected 'nltk' or 'pystemmer'".format(backend))
+        self.backend = backend
+        """the stemmer implementation in use"""
+        # the cache is per instance, a decorated method would share one cache
+        # among all instances and keep them alive
+        self.stem = lru_cache(maxsize=65536)(self._stem)
+        """memoized stem(word)"""
+
+
+    def stem_words(self, words):
+        """
+        :type words: list[str]
+        :return: the list of stems, in the same order as the given words
+        """
+        if self.backend == 'pystemmer':
+            return self.stemmer.stemWords(words)
+        return [self.stem(word) for word in words]
@@ -37,5 +37,9 @@ setup(
         # 'nalaf',
         'spacy',
         'ujson'  # It should be included with spacy, AFAIK
-    ]
+    ],
+
+    extras_require={
+        'fast': ['PyStemmer']
+    }
 )
@@ -0,0 +1,140 @@
+import unittest
+from math import log2
+from operator import itemgetter
+from relna.features.relations import calculateInformationGain
+
+
+class Edge:
+    def __init__(self, real_target, *feature_ids):
+        self.real_target = real_target
+        self.features = {feature_id: 1 for feature_id in feature_ids}
+
+
+class Dataset:
+    def __init__(self, edges):
+        self._edges = edges
+
+    def edges(self):
+        return iter(self._edges)
+
+
+# the computation calculateInformationGain had before counting the features in a single pass
+
+def nested_loop_information_gain(feature_set, dataset, output_file):
+    number_pos_instances = 0
+    number_neg_instances = 0
+
+    for edge in dataset.edges():
+        if edge.real_target == 1:
+            number_pos_instances += 1
+        else:
+            number_neg_instances += 1
+
+    number_total_instances = number_pos_instances + number_neg_instances
+    percentage_pos_instances = number_pos_instances / number_total_instances
+    percentage_neg_instances = number_neg_instances / number_total_instances
+
+    first_ent_component = -1 * (percentage_pos_instances * log2(percentage_pos_instances) + percentage_neg_instances * log2(percentage_neg_instances))
+    feature_list = []
+    for key, value in feature_set.items():
+        feature_present_in_pos = 0
+        feature_present_in_neg = 0
+        feature_absent_in_pos = 0
+        feature_absent_in_neg = 0
+        total_feature_present = 0
+        total_feature_absent = 0
+
+        for edge in dataset.edges():
+            if edge.real_target == 1:
+                if value in edge.features.keys():
+                    feature_present_in_pos += 1
+                    total_feature_present += 1
+                else:
+                    feature_absent_in_pos += 1
+                    total_feature_absent +=1
+            if edge.real_target == -1:
+                if value in edge.features.keys():
+                    feature_present_in_neg += 1
+                    total_feature_present += 1
+                else:
+                    feature_absent_in_neg += 1
+                    total_feature_absent += 1
+
+        percentage_pos_given_feature = 0
+        percentage_neg_given_feature = 0
+        if (total_feature_present > 0):
+            percentage_pos_given_feature = feature_present_in_pos / total_feature_present
+            percentage_neg_given_feature = feature_present_in_neg / total_feature_present
+
+        percentage_pos_given_feature_log = 0
+        percentage_neg_given_feature_log = 0
+        if percentage_pos_given_feature > 0:
+            percentage_pos_given_feature_log = log2(percentage_pos_given_feature)
+        if percentage_neg_given_feature > 0:
+            percentage_neg_given_feature_log = log2(percentage_neg_given_feature)
+
+        second_emp_component_factor = percentage_pos_given_feature * percentage_pos_given_feature_log + \
+                            percentage_neg_given_feature * percentage_neg_given_feature_log
+
+        percentage_feature_given_pos = feature_present_in_pos / number_pos_instances
+        percentage_feature_given_neg = feature_present_in_pos / number_neg_instances
+        percentage_feature = percentage_feature_given_pos * percentage_pos_instances + \
+                    percentage_feature_given_neg * percentage_neg_instances
+
+        second_ent_component = percentage_feature * second_emp_component_factor
+        percentage_pos_given_feature_component = 0
+        percentage_neg_given_feature_component = 0
+        if total_feature_absent>0:
+            percentage_pos_given_feature_component = feature_absent_in_pos / total_feature_absent
+            percentage_neg_given_feature_component = feature_absent_in_neg / total_feature_absent
+
+        percentage_pos_given_feature_component_log = 0
+        percentage_neg_given_feature_component_log = 0
+        if percentage_pos_given_feature_component>0:
+            percentage_pos_given_feature_component_log = log2(percentage_pos_given_feature_component)
+        if percentage_neg_given_feature_component>0:
+            percentage_neg_given_feature_component_log = log2(percentage_neg_given_feature_component)
+
+        third_component_multi_factor = percentage_pos_given_feature_component * percentage_pos_given_feature_component_log + \
+                percentage_neg_given_feature_component * percentage_neg_given_feature_component_log
+
+        percentage_feature_comp_given_pos = feature_absent_in_pos / number_pos_instances
+        percentage_feature_comp_given_neg = feature_absent_in_neg / number_neg_instances
+        percentage_feature_comp = percentage_feature_comp_given_pos * percentage_pos_instances + \
+                    percentage_feature_comp_given_neg * percentage_neg_instances
+
+        third_ent_component = percentage_feature_comp * third_component_multi_factor
+        entropy = first_ent_component + second_ent_component + third_ent_component
+
+        feature_list.append([key, value, entropy])
+
+    feature_list = sorted(feature_list, key=itemgetter(2), reverse=True)
+
+    return feature_list
+
+
+class TestInformationGain(unittest.TestCase):
+
+    def test_same_as_nested_loop_computation(self):
+        feature_set = {'a_[0]': 1, 'b_[0]': 2, 'c_[0]': 3, 'd_[0]': 4, 'never_[0]': 5}
+        dataset = Dataset([
+            Edge(1, 1, 2),
+            Edge(1, 1),
+            Edge(1, 2, 3),
+            Edge(-1, 1, 4),
+            Edge(-1, 3),
+            Edge(-1, 3, 4),
+            Edge(-1),
+            Edge(0, 1, 2, 3),  # neither positive nor negative
+        ])
+
+        expected = nested_loop_information_gain(feature_set, dataset, None)
+        actual = calculateInformationGain(feature_set, dataset, None)
+
+        self.assertEqual([item[:2] for item in actual], [item[:2] for item in expected])
+        for actual_item, expected_item in zip(actual, expected):
+            self.assertAlmostEqual(actual_item[2], expected_item[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
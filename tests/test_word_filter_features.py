@@ -0,0 +1,82 @@
+import unittest
+from relna.features.sentence import WordFilterFeatureGenerator
+
+
+class Token:
+    def __init__(self, word):
+        self.word = word
+
+
+class Part:
+    def __init__(self, *sentences):
+        self.sentences = [[Token(word) for word in sentence.split()] for sentence in sentences]
+
+
+class Edge:
+    def __init__(self, part, sentence_id):
+        self.same_part = part
+        self.same_sentence_id = sentence_id
+        self.features = {}
+
+
+class Dataset:
+    def __init__(self, edges):
+        self._edges = edges
+
+    def edges(self):
+        return iter(self._edges)
+
+
+def generate(generator, *sentences):
+    """
+    :return: the names of the features generated for an edge in each given sentence
+    """
+    part = Part(*sentences)
+    edges = [Edge(part, sentence_id) for sentence_id in range(len(sentences))]
+    feature_set = {}
+    generator.generate(Dataset(edges), feature_set, is_training_mode=True)
+    names = {value: key for key, value in feature_set.items()}
+    return [{names[feature_id] for feature_id in edge.features} for edge in edges]
+
+
+class TestWordFilterFeatureGenerator(unittest.TestCase):
+
+    def test_single_word(self):
+        generator = WordFilterFeatureGenerator(['bind', 'interact'], stem=False)
+        features, = generate(generator, 'A does bind B')
+        self.assertEqual(features, {'6_word_filter_bind_[0]'})
+
+    def test_single_word_stemmed(self):
+        generator = WordFilterFeatureGenerator(['interacts', 'bind'])
+        features, = generate(generator, 'A interacting with B')
+        self.assertEqual(features, {'6_word_filter_stem_interact_[0]'})
+
+    def test_single_word_no_match(self):
+        generator = WordFilterFeatureGenerator(['bind'], stem=False)
+        features, = generate(generator, 'A binds B')
+        self.assertEqual(features, set())
+
+    def test_phrase(self):
+        generator = WordFilterFeatureGenerator(['bind to'], stem=False)
+        adjacent, not_adjacent = generate(generator, 'A does bind to B', 'A does bind B to C')
+        self.assertEqual(adjacent, {'6_word_filter_bind to_[0]'})
+        self.assertEqual(not_adjacent, set())
+
+    def test_phrase_stemmed(self):
+        generator = WordFilterFeatureGenerator(['binds to'])
+        features, = generate(generator, 'A binding to B')
+        self.assertEqual(features, {'6_word_filter_stem_bind to_[0]'})
+
+    def test_phrase_at_end_of_sentence(self):
+        generator = WordFilterFeatureGenerator(['bind to'], stem=False)
+        at_end, cut = generate(generator, 'A and B bind to', 'A and B bind')
+        self.assertEqual(at_end, {'6_word_filter_bind to_[0]'})
+        self.assertEqual(cut, set())
+
+    def test_duplicate_entries(self):
+        generator = WordFilterFeatureGenerator(['bind  to', 'bind to', 'binds to'])
+        self.assertEqual(generator._patterns, {'bind': [('bind', 'to')]})
+
+
+if __name__ == '__main__':
+    unittest.main()